@@ -1,7 +1,7 @@
 import warnings
 from enum import Enum
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, TextIO
 
 
 class MergeStrategy(Enum):
@@ -52,6 +52,36 @@ def load_file(file_path: Path) -> Any:
             raise ValueError(f"Unsupported file format: {file_path.suffix}")
 
 
+def _append(original: Any, new: Any) -> Any:
+    return original + new
+
+
+def _prepend(original: Any, new: Any) -> Any:
+    return new + original
+
+
+def _replace(original: Any, new: Any) -> Any:
+    return new
+
+
+def _union(original: Any, new: Any) -> Any:
+    return original.union(new)
+
+
+# How each strategy merges lists and sets. list_merger, set_merger and
+# dict_merger all look the merge function up here, dict_merger once per call.
+_LIST_MERGERS = {
+    MergeStrategy.APPEND: _append,
+    MergeStrategy.PREPEND: _prepend,
+    MergeStrategy.REPLACE: _replace,
+}
+_SET_MERGERS = {
+    MergeStrategy.APPEND: _union,
+    MergeStrategy.PREPEND: _union,
+    MergeStrategy.REPLACE: _replace,
+}
+
+
 def dict_merger(
     original: dict, new: dict, merge_strategy: MergeStrategy = MergeStrategy.REPLACE
 ) -> dict:
@@ -60,20 +90,57 @@ def dict_merger(
     Args:
         original (dict): The original configuration dictionary.
         new (dict): The new configuration dictionary to merge into the original.
+        merge_strategy (MergeStrategy): The strategy to use for merging lists and sets.
 
     Returns:
         dict: The merged configuration dictionary.
+
+    Raises:
+        ValueError: If the merge strategy is not supported.
     """
-    for key, value in new.items():
-        match (original.get(key), value):
-            case (dict(), dict()):
-                original[key] = dict_merger(original[key], value, merge_strategy)
-            case (list(), list()):
-                original[key] = list_merger(original[key], value, merge_strategy)
-            case (set(), set()):
-                original[key] = set_merger(original[key], value, merge_strategy)
-            case _:
-                original[key] = value
+    try:
+        merge_lists = _LIST_MERGERS[merge_strategy]
+        merge_sets = _SET_MERGERS[merge_strategy]
+    except KeyError:
+        raise ValueError(f"Unsupported merge strategy: {merge_strategy}") from None
+
+    # Walk the nested dicts with an explicit stack instead of recursing. Nested
+    # pairs are pushed in reverse so they are popped in the order of new, like
+    # the recursion did: when several keys share one sub-dict, the last merge
+    # wins. A src that was the last one merged into the same dst is skipped, so
+    # a subtree shared on both sides is only merged once.
+    stack = [(original, new)]
+    last_src: dict[int, int] = {}
+    while stack:
+        dst, src = stack.pop()
+        if dst is src or not src:
+            # Merging a dict into itself or merging an empty dict changes nothing.
+            continue
+        if last_src.get(id(dst)) == id(src):
+            continue
+        last_src[id(dst)] = id(src)
+        if dst.keys().isdisjoint(src):
+            # Nothing to merge key by key, let dict.update copy everything.
+            dst.update(src)
+            continue
+        nested = []
+        # Walk src in its own order, so new keys are appended in that order.
+        for key, value in src.items():
+            if key not in dst:
+                dst[key] = value
+                continue
+            current = dst[key]
+            # Plain isinstance checks, matching on a (current, value) tuple
+            # would build a throwaway tuple for every key.
+            if isinstance(current, dict) and isinstance(value, dict):
+                nested.append((current, value))
+            elif isinstance(current, list) and isinstance(value, list):
+                dst[key] = merge_lists(current, value)
+            elif isinstance(current, set) and isinstance(value, set):
+                dst[key] = merge_sets(current, value)
+            else:
+                dst[key] = value
+        stack.extend(reversed(nested))
     return original
 
 
@@ -95,15 +162,11 @@ def list_merger(
     if new is None:
         return original
 
-    match merge_strategy:
-        case MergeStrategy.APPEND:
-            return original + new
-        case MergeStrategy.PREPEND:
-            return new + original
-        case MergeStrategy.REPLACE:
-            return new
-        case _:
-            raise ValueError(f"Unsupported merge strategy: {merge_strategy}")
+    try:
+        merge = _LIST_MERGERS[merge_strategy]
+    except KeyError:
+        raise ValueError(f"Unsupported merge strategy: {merge_strategy}") from None
+    return merge(original, new)
 
 
 def set_merger(
@@ -124,78 +187,120 @@ def set_merger(
     if new is None:
         return original
 
-    match merge_strategy:
-        case MergeStrategy.APPEND | MergeStrategy.PREPEND:
-            return original.union(new)
-        case MergeStrategy.REPLACE:
-            return new
-        case _:
-            raise ValueError(f"Unsupported merge strategy: {merge_strategy}")
+    try:
+        merge = _SET_MERGERS[merge_strategy]
+    except KeyError:
+        raise ValueError(f"Unsupported merge strategy: {merge_strategy}") from None
+    return merge(original, new)
+
+
+def _writes_utf8(fh: TextIO) -> bool:
+    """Return True if text written to fh ends up encoded as UTF-8."""
+    import codecs
+
+    encoding = getattr(fh, "encoding", None)
+    if not encoding:
+        return False
+    try:
+        return codecs.lookup(encoding).name == "utf-8"
+    except LookupError:
+        return False
+
+
+def _write_yaml(data: Any, fh: TextIO) -> None:
+    import yaml
+
+    # Prefer the libyaml emitter, PyYAML can be installed without it.
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    yaml.dump(data, fh, Dumper=dumper, allow_unicode=_writes_utf8(fh))
+
+
+def _write_toml(data: Any, fh: TextIO) -> None:
+    import tomli_w
+
+    fh.write(tomli_w.dumps(data))
+
+
+def _write_json(data: Any, fh: TextIO) -> None:
+    import json
+
+    # Only write non-ASCII characters as-is where they can be encoded, e.g. a
+    # cp1252 stdout would raise UnicodeEncodeError.
+    json.dump(data, fh, indent=4, ensure_ascii=not _writes_utf8(fh))
+
+
+def _write_env(data: Any, fh: TextIO) -> None:
+    # Build the whole file first so it is written with a single call
+    fh.write("".join(f"{key}={value}\n" for key, value in data.items()))
+
+
+# Writers used by dump_file, keyed by lower-case file extension.
+_WRITERS = {
+    ".yaml": _write_yaml,
+    ".yml": _write_yaml,
+    ".toml": _write_toml,
+    ".json": _write_json,
+    ".env": _write_env,
+}
 
 
 def dump_file(
     data: Any,
-    file_path: Path | None,
+    file_path: Path | TextIO | None,
     file_type: Literal["yaml", "toml", "json", "env"] | None = None,
 ) -> None:
     """
-    Write data to a file or stdout in various formats.
-    This function serializes and writes data to a file or standard output in the specified format.
+    Write data to a file, an open text stream or stdout in various formats.
+    This function serializes and writes data to a file, an open text stream or standard
+    output in the specified format.
     Supported formats include YAML, TOML, JSON, and ENV (environment variable format).
     Args:
         data (Any): The data to be written. Should be serializable in the chosen format.
             For YAML, TOML, and JSON, this is typically a dictionary or list.
             For ENV format, this must be a dictionary with string keys and values.
-        file_path (Path | None): The path to the output file. If None, writes to stdout.
+        file_path (Path | TextIO | None): The path to the output file, or an open text
+            stream to write to. If None, writes to stdout.
         file_type (Literal["yaml", "toml", "json", "env"] | None, optional): The format to write.
-            Required when file_path is None. When file_path is provided, the format is
-            determined from the file extension. Defaults to None.
+            Required when file_path is None or a stream. When file_path is a Path, the
+            format is determined from the file extension. Defaults to None.
     Raises:
-        ValueError: If file_type is None when file_path is None, or if the file format
-            is not supported.
+        ValueError: If file_type is None when file_path is None or a stream, or if the
+            file format is not supported.
     Example:
+        >>> import io
         >>> from pathlib import Path
         >>> data = {"key": "value", "number": 42}
         >>> dump_file(data, Path("config.yaml"))
         >>> dump_file(data, None, file_type="json")  # Writes to stdout
+        >>> dump_file(data, io.StringIO(), file_type="toml")  # Writes to a stream
     Note:
         - For YAML files, extensions .yaml and .yml are both supported
         - For ENV files, each key-value pair is written as KEY=VALUE on a new line
-        - The file is automatically closed after writing (except for stdout)
+        - The file is automatically closed after writing (except for stdout and streams)
     """
-    try:
-        if file_path is None:
-            if file_type is None:
-                raise ValueError("file_type must be specified when file_path is None")
-            import sys
+    if isinstance(file_path, Path):
+        suffix = file_path.suffix.lower()
+    else:
+        if file_type is None:
+            raise ValueError(
+                "file_type must be specified when file_path is None or a stream"
+            )
+        suffix = f".{file_type}"
 
-            fh = sys.stdout
-            suffix = f".{file_type}"
-        else:
-            fh = file_path.open("w", encoding="utf-8")
-            suffix = file_path.suffix.lower()
-
-        match suffix:
-            case ".yaml" | ".yml":
-                import yaml
-
-                yaml.safe_dump(data, fh)
-            case ".toml":
-                import tomli_w
-
-                fh.write(tomli_w.dumps(data))
-            case ".json":
-                import json
-
-                json.dump(data, fh, indent=4)
-            case ".env":
-                for key, value in data.items():
-                    fh.write(f"{key}={value}\n")
-            case _:
-                raise ValueError(f"Unsupported file format: {suffix}")
-    finally:
-        if file_path is not None:
-            fh.close()
+    try:
+        writer = _WRITERS[suffix]
+    except KeyError:
+        raise ValueError(f"Unsupported file format: {suffix}") from None
+
+    if file_path is None:
+        import sys
+
+        writer(data, sys.stdout)
+    elif isinstance(file_path, Path):
+        with file_path.open("w", encoding="utf-8") as fh:
+            writer(data, fh)
+    else:
+        writer(data, file_path)
 
 
 def merge_configs(
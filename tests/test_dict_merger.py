@@ -1,281 +1,294 @@
-import copy
-
 import pytest
 
 from blendconf import MergeStrategy, dict_merger
 
+# Short CPU-bound tests, not worth spreading across xdist workers
+pytestmark = pytest.mark.xdist_group("cpu")
 
-@pytest.mark.parametrize(
-    "original,new,merge_strategy,expected",
-    [
-        # Basic dictionary merging with nested dicts
-        (
-            {"a": 1, "b": {"c": 2}},
-            {"b": {"d": 3}, "e": 4},
-            MergeStrategy.REPLACE,
-            {"a": 1, "b": {"c": 2, "d": 3}, "e": 4},
-        ),
-        (
-            {"a": 1, "b": {"c": 2}},
-            {"b": {"d": 3}, "e": 4},
-            MergeStrategy.APPEND,
-            {"a": 1, "b": {"c": 2, "d": 3}, "e": 4},
-        ),
-        (
-            {"a": 1, "b": {"c": 2}},
-            {"b": {"d": 3}, "e": 4},
-            MergeStrategy.PREPEND,
-            {"a": 1, "b": {"c": 2, "d": 3}, "e": 4},
-        ),
-    ],
+
+def _clone(value):
+    """Copy the dict/list/set/scalar payloads used in these tests."""
+    match value:
+        case dict():
+            return {key: _clone(item) for key, item in value.items()}
+        case list():
+            return [_clone(item) for item in value]
+        case set():
+            return set(value)
+        case _:
+            return value
+
+
+_STRATEGY_CASES = (
+    # Basic dictionary merging with nested dicts
+    (
+        {"a": 1, "b": {"c": 2}},
+        {"b": {"d": 3}, "e": 4},
+        MergeStrategy.REPLACE,
+        {"a": 1, "b": {"c": 2, "d": 3}, "e": 4},
+    ),
+    (
+        {"a": 1, "b": {"c": 2}},
+        {"b": {"d": 3}, "e": 4},
+        MergeStrategy.APPEND,
+        {"a": 1, "b": {"c": 2, "d": 3}, "e": 4},
+    ),
+    (
+        {"a": 1, "b": {"c": 2}},
+        {"b": {"d": 3}, "e": 4},
+        MergeStrategy.PREPEND,
+        {"a": 1, "b": {"c": 2, "d": 3}, "e": 4},
+    ),
 )
+
+
+@pytest.mark.parametrize("original,new,merge_strategy,expected", _STRATEGY_CASES)
 def test_dict_merger_strategies(original, new, merge_strategy, expected):
     """Test dict merging with different strategies."""
-    original_copy = copy.deepcopy(original)
-    result = dict_merger(original_copy, new, merge_strategy)
+    result = dict_merger(_clone(original), new, merge_strategy)
     assert result == expected
 
 
-@pytest.mark.parametrize(
-    "original,new,expected",
-    [
-        # Empty dicts
-        ({}, {}, {}),
-        ({}, {"a": 1, "b": 2}, {"a": 1, "b": 2}),
-        ({"a": 1, "b": 2}, {}, {"a": 1, "b": 2}),
-        # Simple merge
-        ({"a": 1}, {"b": 2}, {"a": 1, "b": 2}),
-        # Overwrite simple value
-        ({"a": 1}, {"a": 2}, {"a": 2}),
-    ],
+_BASIC_CASES = (
+    # Empty dicts
+    ({}, {}, {}),
+    ({}, {"a": 1, "b": 2}, {"a": 1, "b": 2}),
+    ({"a": 1, "b": 2}, {}, {"a": 1, "b": 2}),
+    # Simple merge
+    ({"a": 1}, {"b": 2}, {"a": 1, "b": 2}),
+    # Overwrite simple value
+    ({"a": 1}, {"a": 2}, {"a": 2}),
 )
+
+
+@pytest.mark.parametrize("original,new,expected", _BASIC_CASES)
 def test_dict_merger_basic(original, new, expected):
     """Test basic dictionary merging scenarios."""
-    result = dict_merger(original, new)
+    result = dict_merger(_clone(original), new)
     assert result == expected
 
 
-@pytest.mark.parametrize(
-    "original,new,expected",
-    [
-        # Nested dict merge
-        (
-            {"a": {"b": 1, "c": 2}},
-            {"a": {"c": 3, "d": 4}},
-            {"a": {"b": 1, "c": 3, "d": 4}},
-        ),
-        # Deeply nested dict merge
-        (
-            {"a": {"b": {"c": {"d": 1}}}},
-            {"a": {"b": {"c": {"e": 2}}}},
-            {"a": {"b": {"c": {"d": 1, "e": 2}}}},
-        ),
-        # Nested dict to simple value
-        ({"a": {"b": 1}}, {"a": 5}, {"a": 5}),
-        # Simple value to nested dict
-        ({"a": 5}, {"a": {"b": 1}}, {"a": {"b": 1}}),
-        # Very deep nesting
-        (
-            {"a": {"b": {"c": {"d": {"e": {"f": 1}}}}}},
-            {"a": {"b": {"c": {"d": {"e": {"g": 2}}}}}},
-            {"a": {"b": {"c": {"d": {"e": {"f": 1, "g": 2}}}}}},
-        ),
-    ],
+_NESTED_CASES = (
+    # Nested dict merge
+    (
+        {"a": {"b": 1, "c": 2}},
+        {"a": {"c": 3, "d": 4}},
+        {"a": {"b": 1, "c": 3, "d": 4}},
+    ),
+    # Deeply nested dict merge
+    (
+        {"a": {"b": {"c": {"d": 1}}}},
+        {"a": {"b": {"c": {"e": 2}}}},
+        {"a": {"b": {"c": {"d": 1, "e": 2}}}},
+    ),
+    # Nested dict to simple value
+    ({"a": {"b": 1}}, {"a": 5}, {"a": 5}),
+    # Simple value to nested dict
+    ({"a": 5}, {"a": {"b": 1}}, {"a": {"b": 1}}),
+    # Very deep nesting
+    (
+        {"a": {"b": {"c": {"d": {"e": {"f": 1}}}}}},
+        {"a": {"b": {"c": {"d": {"e": {"g": 2}}}}}},
+        {"a": {"b": {"c": {"d": {"e": {"f": 1, "g": 2}}}}}},
+    ),
 )
+
+
+@pytest.mark.parametrize("original,new,expected", _NESTED_CASES)
 def test_dict_merger_nested(original, new, expected):
     """Test nested dictionary merging."""
-    result = dict_merger(original, new)
+    result = dict_merger(_clone(original), new)
     assert result == expected
 
 
-@pytest.mark.parametrize(
-    "original,new,merge_strategy,expected",
-    [
-        # List merge with REPLACE
-        (
-            {"items": [1, 2, 3]},
-            {"items": [4, 5]},
-            MergeStrategy.REPLACE,
-            {"items": [4, 5]},
-        ),
-        # List merge with APPEND
-        (
-            {"items": [1, 2, 3]},
-            {"items": [4, 5]},
-            MergeStrategy.APPEND,
-            {"items": [1, 2, 3, 4, 5]},
-        ),
-        # List merge with PREPEND
-        (
-            {"items": [1, 2, 3]},
-            {"items": [4, 5]},
-            MergeStrategy.PREPEND,
-            {"items": [4, 5, 1, 2, 3]},
-        ),
-        # Nested dict with lists
-        (
-            {"config": {"ports": [8080, 8081]}},
-            {"config": {"ports": [9000]}},
-            MergeStrategy.APPEND,
-            {"config": {"ports": [8080, 8081, 9000]}},
-        ),
-        # List to non-list
-        (
-            {"items": [1, 2, 3]},
-            {"items": "single"},
-            MergeStrategy.REPLACE,
-            {"items": "single"},
-        ),
-        # Non-list to list
-        (
-            {"items": "single"},
-            {"items": [1, 2, 3]},
-            MergeStrategy.REPLACE,
-            {"items": [1, 2, 3]},
-        ),
-    ],
+_LIST_CASES = (
+    # List merge with REPLACE
+    (
+        {"items": [1, 2, 3]},
+        {"items": [4, 5]},
+        MergeStrategy.REPLACE,
+        {"items": [4, 5]},
+    ),
+    # List merge with APPEND
+    (
+        {"items": [1, 2, 3]},
+        {"items": [4, 5]},
+        MergeStrategy.APPEND,
+        {"items": [1, 2, 3, 4, 5]},
+    ),
+    # List merge with PREPEND
+    (
+        {"items": [1, 2, 3]},
+        {"items": [4, 5]},
+        MergeStrategy.PREPEND,
+        {"items": [4, 5, 1, 2, 3]},
+    ),
+    # Nested dict with lists
+    (
+        {"config": {"ports": [8080, 8081]}},
+        {"config": {"ports": [9000]}},
+        MergeStrategy.APPEND,
+        {"config": {"ports": [8080, 8081, 9000]}},
+    ),
+    # List to non-list
+    (
+        {"items": [1, 2, 3]},
+        {"items": "single"},
+        MergeStrategy.REPLACE,
+        {"items": "single"},
+    ),
+    # Non-list to list
+    (
+        {"items": "single"},
+        {"items": [1, 2, 3]},
+        MergeStrategy.REPLACE,
+        {"items": [1, 2, 3]},
+    ),
 )
+
+
+@pytest.mark.parametrize("original,new,merge_strategy,expected", _LIST_CASES)
 def test_dict_merger_with_lists(original, new, merge_strategy, expected):
     """Test dictionary merging with list values."""
-    result = dict_merger(original, new, merge_strategy)
+    result = dict_merger(_clone(original), new, merge_strategy)
     assert result == expected
 
 
-@pytest.mark.parametrize(
-    "original,new,merge_strategy,expected",
-    [
-        # Set merge with REPLACE
-        (
-            {"tags": {1, 2, 3}},
-            {"tags": {4, 5}},
-            MergeStrategy.REPLACE,
-            {"tags": {4, 5}},
-        ),
-        # Set merge with APPEND (union)
-        (
-            {"tags": {1, 2, 3}},
-            {"tags": {3, 4, 5}},
-            MergeStrategy.APPEND,
-            {"tags": {1, 2, 3, 4, 5}},
-        ),
-        # Set merge with PREPEND (union)
-        (
-            {"tags": {1, 2, 3}},
-            {"tags": {3, 4, 5}},
-            MergeStrategy.PREPEND,
-            {"tags": {1, 2, 3, 4, 5}},
-        ),
-        # Nested dict with sets
-        (
-            {"config": {"flags": {"a", "b"}}},
-            {"config": {"flags": {"c"}}},
-            MergeStrategy.APPEND,
-            {"config": {"flags": {"a", "b", "c"}}},
-        ),
-    ],
+_SET_CASES = (
+    # Set merge with REPLACE
+    (
+        {"tags": {1, 2, 3}},
+        {"tags": {4, 5}},
+        MergeStrategy.REPLACE,
+        {"tags": {4, 5}},
+    ),
+    # Set merge with APPEND (union)
+    (
+        {"tags": {1, 2, 3}},
+        {"tags": {3, 4, 5}},
+        MergeStrategy.APPEND,
+        {"tags": {1, 2, 3, 4, 5}},
+    ),
+    # Set merge with PREPEND (union)
+    (
+        {"tags": {1, 2, 3}},
+        {"tags": {3, 4, 5}},
+        MergeStrategy.PREPEND,
+        {"tags": {1, 2, 3, 4, 5}},
+    ),
+    # Nested dict with sets
+    (
+        {"config": {"flags": {"a", "b"}}},
+        {"config": {"flags": {"c"}}},
+        MergeStrategy.APPEND,
+        {"config": {"flags": {"a", "b", "c"}}},
+    ),
 )
+
+
+@pytest.mark.parametrize("original,new,merge_strategy,expected", _SET_CASES)
 def test_dict_merger_with_sets(original, new, merge_strategy, expected):
     """Test dictionary merging with set values."""
-    result = dict_merger(original, new, merge_strategy)
+    result = dict_merger(_clone(original), new, merge_strategy)
     assert result == expected
 
 
-@pytest.mark.parametrize(
-    "original,new,merge_strategy,expected",
-    [
-        # Mixed types in nested structure
-        (
-            {"database": {"hosts": ["localhost"], "ports": {5432}}, "debug": True},
-            {
-                "database": {"hosts": ["remote"], "timeout": 30},
-                "logging": {"level": "INFO"},
-            },
-            MergeStrategy.APPEND,
-            {
-                "database": {
-                    "hosts": ["localhost", "remote"],
-                    "ports": {5432},
-                    "timeout": 30,
-                },
-                "debug": True,
-                "logging": {"level": "INFO"},
-            },
-        ),
-        # Multiple levels with PREPEND
-        (
-            {"level1": {"level2": {"items": [1, 2]}, "other": [10, 20]}, "top": [100]},
-            {"level1": {"level2": {"items": [3, 4]}, "other": [30]}, "top": [200]},
-            MergeStrategy.PREPEND,
-            {
-                "level1": {"level2": {"items": [3, 4, 1, 2]}, "other": [30, 10, 20]},
-                "top": [200, 100],
-            },
-        ),
-        # None values
-        (
-            {"a": None, "b": 1},
-            {"a": 2, "c": None},
-            MergeStrategy.REPLACE,
-            {"a": 2, "b": 1, "c": None},
-        ),
-        # Different primitive types
-        (
-            {"string": "hello", "int": 42, "float": 3.14, "bool": True},
-            {
-                "string": "world",
-                "int": 99,
-                "float": 2.71,
-                "bool": False,
-                "new_key": "new_value",
+_COMPLEX_CASES = (
+    # Mixed types in nested structure
+    (
+        {"database": {"hosts": ["localhost"], "ports": {5432}}, "debug": True},
+        {
+            "database": {"hosts": ["remote"], "timeout": 30},
+            "logging": {"level": "INFO"},
+        },
+        MergeStrategy.APPEND,
+        {
+            "database": {
+                "hosts": ["localhost", "remote"],
+                "ports": {5432},
+                "timeout": 30,
             },
-            MergeStrategy.REPLACE,
-            {
-                "string": "world",
-                "int": 99,
-                "float": 2.71,
-                "bool": False,
-                "new_key": "new_value",
-            },
-        ),
-    ],
+            "debug": True,
+            "logging": {"level": "INFO"},
+        },
+    ),
+    # Multiple levels with PREPEND
+    (
+        {"level1": {"level2": {"items": [1, 2]}, "other": [10, 20]}, "top": [100]},
+        {"level1": {"level2": {"items": [3, 4]}, "other": [30]}, "top": [200]},
+        MergeStrategy.PREPEND,
+        {
+            "level1": {"level2": {"items": [3, 4, 1, 2]}, "other": [30, 10, 20]},
+            "top": [200, 100],
+        },
+    ),
+    # None values
+    (
+        {"a": None, "b": 1},
+        {"a": 2, "c": None},
+        MergeStrategy.REPLACE,
+        {"a": 2, "b": 1, "c": None},
+    ),
+    # Different primitive types
+    (
+        {"string": "hello", "int": 42, "float": 3.14, "bool": True},
+        {
+            "string": "world",
+            "int": 99,
+            "float": 2.71,
+            "bool": False,
+            "new_key": "new_value",
+        },
+        MergeStrategy.REPLACE,
+        {
+            "string": "world",
+            "int": 99,
+            "float": 2.71,
+            "bool": False,
+            "new_key": "new_value",
+        },
+    ),
 )
+
+
+@pytest.mark.parametrize("original,new,merge_strategy,expected", _COMPLEX_CASES)
 def test_dict_merger_complex_scenarios(original, new, merge_strategy, expected):
     """Test complex merging scenarios with mixed types."""
-    result = dict_merger(original, new, merge_strategy)
+    result = dict_merger(_clone(original), new, merge_strategy)
     assert result == expected
 
 
-@pytest.mark.parametrize(
-    "original,new,expected",
-    [
-        # Keys with special characters
-        (
-            {"key-with-dash": 1, "key.with.dot": 2},
-            {"key_with_underscore": 3, "key with space": 4},
-            {
-                "key-with-dash": 1,
-                "key.with.dot": 2,
-                "key_with_underscore": 3,
-                "key with space": 4,
-            },
-        ),
-        # Numeric string keys
-        (
-            {"1": "one", "2": "two"},
-            {"3": "three", "1": "ONE"},
-            {"1": "ONE", "2": "two", "3": "three"},
-        ),
-        # Empty strings and lists
-        (
-            {"empty_str": "", "empty_list": []},
-            {"empty_str": "filled", "empty_list": [1, 2]},
-            {"empty_str": "filled", "empty_list": [1, 2]},
-        ),
-    ],
+_EDGE_CASES = (
+    # Keys with special characters
+    (
+        {"key-with-dash": 1, "key.with.dot": 2},
+        {"key_with_underscore": 3, "key with space": 4},
+        {
+            "key-with-dash": 1,
+            "key.with.dot": 2,
+            "key_with_underscore": 3,
+            "key with space": 4,
+        },
+    ),
+    # Numeric string keys
+    (
+        {"1": "one", "2": "two"},
+        {"3": "three", "1": "ONE"},
+        {"1": "ONE", "2": "two", "3": "three"},
+    ),
+    # Empty strings and lists
+    (
+        {"empty_str": "", "empty_list": []},
+        {"empty_str": "filled", "empty_list": [1, 2]},
+        {"empty_str": "filled", "empty_list": [1, 2]},
+    ),
 )
+
+
+@pytest.mark.parametrize("original,new,expected", _EDGE_CASES)
 def test_dict_merger_edge_cases(original, new, expected):
     """Test edge cases with special keys and empty values."""
-    result = dict_merger(original, new)
+    result = dict_merger(_clone(original), new)
     assert result == expected
 
 
@@ -290,9 +303,9 @@ def test_dict_merger_modifies_original():
 
 
 def test_dict_merger_with_deepcopy_changes_original():
-    """Test that using deepcopy preserves the original dict."""
+    """Test that merging changes the original dict compared to a copy of it."""
     original = {"a": 1, "b": {"c": 2}}
-    original_backup = copy.deepcopy(original)
+    original_backup = _clone(original)
     new = {"b": {"d": 3}}
     result = dict_merger(original, new)
     # Original should be changed
@@ -300,11 +313,82 @@ def test_dict_merger_with_deepcopy_changes_original():
     assert result == {"a": 1, "b": {"c": 2, "d": 3}}
 
 
+_LARGE_ORIGINAL = {f"key_{i}": i for i in range(100)}
+_LARGE_NEW = {f"key_{i}": i * 2 for i in range(50, 150)}
+_LARGE_EXPECTED = {f"key_{i}": i if i < 50 else i * 2 for i in range(150)}
+
+
 def test_dict_merger_large_number_of_keys():
     """Test merging dictionaries with many keys."""
-    original = {f"key_{i}": i for i in range(100)}
-    new = {f"key_{i}": i * 2 for i in range(50, 150)}
+    # dict_merger modifies original, so merge into a fresh copy
+    result = dict_merger(dict(_LARGE_ORIGINAL), _LARGE_NEW)
+    assert result == _LARGE_EXPECTED
+
+
+@pytest.mark.parametrize(
+    "merge_strategy",
+    [MergeStrategy.REPLACE, MergeStrategy.APPEND, MergeStrategy.PREPEND],
+)
+def test_dict_merger_with_itself(merge_strategy):
+    """Test that merging a dict into itself leaves it unchanged."""
+    original = {"items": [1, 2], "nested": {"tags": {"a"}}}
+    result = dict_merger(original, original, merge_strategy)
+    assert result is original
+    assert result == {"items": [1, 2], "nested": {"tags": {"a"}}}
+
+
+def test_dict_merger_shared_subtree_merged_once():
+    """Test that a sub-dict shared by several keys is only merged once."""
+    shared = {"items": [1]}
+    original = {"a": shared, "b": shared}
+    shared_new = {"items": [2]}
+    new = {"a": shared_new, "b": shared_new}
+    result = dict_merger(original, new, MergeStrategy.APPEND)
+    assert result == {"a": {"items": [1, 2]}, "b": {"items": [1, 2]}}
+    assert result["a"] is result["b"]
+
+
+def test_dict_merger_shared_dst_merged_again_after_other_src():
+    """Test that merging S, T, S into one shared sub-dict ends up with S."""
+    shared = {"port": 1}
+    original = {"a": shared, "b": shared, "c": shared}
+    first, second = {"port": 10}, {"port": 20}
+    new = {"a": first, "b": second, "c": first}
     result = dict_merger(original, new)
-    expected = {f"key_{i}": i for i in range(50)}
-    expected.update({f"key_{i}": i * 2 for i in range(50, 150)})
-    assert result == expected
+    assert shared == {"port": 10}
+    assert result["a"] is result["b"] is result["c"] is shared
+
+
+def test_dict_merger_nested_merges_follow_new_order():
+    """Test that a sub-dict shared by several keys ends up with the last merge."""
+    shared = {"port": 1}
+    original = {1: shared, 2: shared, 3: shared}
+    new = {1: {"port": 10}, 2: {"port": 20}, 3: {"port": 30}}
+    result = dict_merger(original, new)
+    assert result == {1: {"port": 30}, 2: {"port": 30}, 3: {"port": 30}}
+
+
+def test_dict_merger_shared_dst_with_different_srcs():
+    """Test merging different dicts into a sub-dict shared via a YAML anchor."""
+    # base: &b {port: 1}, alpha: *b, beta: *b, gamma: *b
+    base = {"port": 1}
+    original = {"base": base, "alpha": base, "beta": base, "gamma": base}
+    new = {"alpha": {"port": 10}, "beta": {"port": 20}, "gamma": {"port": 30}}
+    result = dict_merger(original, new)
+    assert result["base"] == {"port": 30}
+    assert result["alpha"] is result["beta"] is result["gamma"] is base
+
+
+def test_dict_merger_unsupported_strategy():
+    """Test that an unknown merge strategy raises ValueError."""
+    with pytest.raises(ValueError, match="Unsupported merge strategy"):
+        dict_merger({"a": [1]}, {"a": [2]}, "unknown")
+
+
+def test_dict_merger_preserves_key_order():
+    """Test that existing keys keep their position and new keys are appended."""
+    original = {"a": 1, "b": {"x": 1}, "c": 3}
+    new = {"d": 4, "b": {"y": 2}, "a": 10, "e": 5}
+    result = dict_merger(original, new)
+    assert list(result) == ["a", "b", "c", "d", "e"]
+    assert list(result["b"]) == ["x", "y"]
@@ -1,3 +1,4 @@
+import io
 import json
 from pathlib import Path
 
@@ -8,81 +9,82 @@ from dotenv import dotenv_values
 
 from blendconf import dump_file
 
+# Parsers for the text written by dump_file, keyed by file_type
+LOADERS = {
+    "json": json.loads,
+    "yaml": yaml.safe_load,
+    "toml": tomli.loads,
+    "env": lambda out: dotenv_values(stream=io.StringIO(out)),
+}
+
 
 @pytest.mark.parametrize(
-    "extension,data,loader",
+    "file_type,data",
     [
         # JSON tests with various data types
-        (".json", {"key": "value", "number": 42}, lambda p: json.load(p.open("r"))),
-        (".json", {"nested": {"data": [1, 2, 3]}}, lambda p: json.load(p.open("r"))),
-        (
-            ".json",
-            {"list": [1, 2, 3], "bool": True, "null": None},
-            lambda p: json.load(p.open("r")),
-        ),
-        (".json", [], lambda p: json.load(p.open("r"))),
-        (".json", [1, 2, 3], lambda p: json.load(p.open("r"))),
-        (".json", {"unicode": "héllo wörld 世界"}, lambda p: json.load(p.open("r"))),
-        (".json", {"empty_dict": {}}, lambda p: json.load(p.open("r"))),
-        (".json", {"empty_list": []}, lambda p: json.load(p.open("r"))),
-        # YAML tests with .yaml extension
-        (
-            ".yaml",
-            {"key": "value", "number": 42},
-            lambda p: yaml.safe_load(p.open("r")),
-        ),
-        (
-            ".yaml",
-            {"nested": {"data": [1, 2, 3]}},
-            lambda p: yaml.safe_load(p.open("r")),
-        ),
-        (
-            ".yaml",
-            {"list": [1, 2, 3], "bool": True, "null": None},
-            lambda p: yaml.safe_load(p.open("r")),
-        ),
-        (".yaml", [], lambda p: yaml.safe_load(p.open("r"))),
-        (".yaml", [1, 2, 3], lambda p: yaml.safe_load(p.open("r"))),
-        (
-            ".yaml",
-            {"unicode": "héllo wörld 世界"},
-            lambda p: yaml.safe_load(p.open("r")),
+        pytest.param("json", {"key": "value", "number": 42}, id="json-dict"),
+        pytest.param("json", {"nested": {"data": [1, 2, 3]}}, id="json-nested"),
+        pytest.param(
+            "json", {"list": [1, 2, 3], "bool": True, "null": None}, id="json-mixed"
         ),
-        # YAML tests with .yml extension
-        (".yml", {"key": "value", "number": 42}, lambda p: yaml.safe_load(p.open("r"))),
-        (
-            ".yml",
-            {"nested": {"data": [1, 2, 3]}},
-            lambda p: yaml.safe_load(p.open("r")),
+        pytest.param("json", [], id="json-empty-list"),
+        pytest.param("json", [1, 2, 3], id="json-list"),
+        pytest.param("json", {"unicode": "héllo wörld 世界"}, id="json-unicode"),
+        pytest.param("json", {"empty_dict": {}}, id="json-nested-empty-dict"),
+        pytest.param("json", {"empty_list": []}, id="json-nested-empty-list"),
+        # YAML tests
+        pytest.param("yaml", {"key": "value", "number": 42}, id="yaml-dict"),
+        pytest.param("yaml", {"nested": {"data": [1, 2, 3]}}, id="yaml-nested"),
+        pytest.param(
+            "yaml", {"list": [1, 2, 3], "bool": True, "null": None}, id="yaml-mixed"
         ),
+        pytest.param("yaml", [], id="yaml-empty-list"),
+        pytest.param("yaml", [1, 2, 3], id="yaml-list"),
+        pytest.param("yaml", {"unicode": "héllo wörld 世界"}, id="yaml-unicode"),
         # TOML tests
-        (".toml", {"key": "value", "number": 42}, lambda p: tomli.load(p.open("rb"))),
-        (".toml", {"nested": {"data": [1, 2, 3]}}, lambda p: tomli.load(p.open("rb"))),
-        (
-            ".toml",
+        pytest.param("toml", {"key": "value", "number": 42}, id="toml-dict"),
+        pytest.param("toml", {"nested": {"data": [1, 2, 3]}}, id="toml-nested"),
+        pytest.param(
+            "toml",
             {"string": "test", "bool": True, "list": [1, 2, 3]},
-            lambda p: tomli.load(p.open("rb")),
+            id="toml-mixed",
         ),
         # ENV tests
-        (".env", {"KEY": "value", "NUMBER": "42"}, lambda p: dotenv_values(p)),
-        (
-            ".env",
-            {"EMPTY": "", "SPACES": "value with spaces"},
-            lambda p: dotenv_values(p),
+        pytest.param("env", {"KEY": "value", "NUMBER": "42"}, id="env-basic"),
+        pytest.param(
+            "env", {"EMPTY": "", "SPACES": "value with spaces"}, id="env-special"
         ),
-        (".env", {"UNICODE": "héllo"}, lambda p: dotenv_values(p)),
+        pytest.param("env", {"UNICODE": "héllo"}, id="env-unicode"),
     ],
 )
-def test_dump_file_various_formats_and_data(tmp_path, extension, data, loader):
-    """Test dumping various data types to different file formats."""
-    file_path = tmp_path / f"output{extension}"
-    dump_file(data, file_path)
+def test_dump_file_various_formats_and_data(file_type, data):
+    """Test dumping various data types to different formats."""
+    buf = io.StringIO()
+    dump_file(data, buf, file_type=file_type)
 
-    assert file_path.exists()
-    result = loader(file_path)
+    result = LOADERS[file_type](buf.getvalue())
+    assert result == data
+
+
+@pytest.mark.parametrize("file_type", ["json", "yaml"])
+def test_dump_file_non_utf8_stream(file_type):
+    """Test that non-ASCII data is escaped for streams that are not UTF-8."""
+    data = {"unicode": "héllo wörld 世界"}
+    raw = io.BytesIO()
+    buf = io.TextIOWrapper(raw, encoding="cp1252")
+    dump_file(data, buf, file_type=file_type)
+    buf.flush()
+
+    result = LOADERS[file_type](raw.getvalue().decode("cp1252"))
     assert result == data
 
 
+def test_dump_file_to_stream_without_file_type():
+    """Test that dumping to a stream without file_type raises ValueError."""
+    with pytest.raises(ValueError, match="file_type must be specified"):
+        dump_file({"key": "value"}, io.StringIO())
+
+
 @pytest.mark.parametrize(
     "extension",
     [".json", ".yaml", ".yml", ".toml", ".env"],
@@ -275,29 +277,25 @@ def test_dump_file_unsupported_format(tmp_path, extension):
 
     with pytest.raises(ValueError, match="Unsupported file format"):
         dump_file(data, file_path)
+    # The format is checked before the file is opened
+    assert not file_path.exists()
 
 
 @pytest.mark.parametrize(
-    "file_type,data,parser",
+    "file_type,data",
     [
-        ("json", {"key": "value", "number": 42}, lambda out: json.loads(out)),
-        ("yaml", {"key": "value", "number": 42}, lambda out: yaml.safe_load(out)),
-        ("toml", {"key": "value", "number": 42}, lambda out: tomli.loads(out)),
-        (
-            "env",
-            {"KEY": "value", "NUMBER": "42"},
-            lambda out: dict(
-                line.split("=", 1) for line in out.strip().split("\n") if line
-            ),
-        ),
+        ("json", {"key": "value", "number": 42}),
+        ("yaml", {"key": "value", "number": 42}),
+        ("toml", {"key": "value", "number": 42}),
+        ("env", {"KEY": "value", "NUMBER": "42"}),
     ],
 )
-def test_dump_file_to_stdout(capsys, file_type, data, parser):
+def test_dump_file_to_stdout(capsys, file_type, data):
     """Test dumping various formats to stdout when file_path is None."""
     dump_file(data, None, file_type=file_type)
 
     captured = capsys.readouterr()
-    result = parser(captured.out)
+    result = LOADERS[file_type](captured.out)
     assert result == data
 
 
@@ -319,6 +317,16 @@ def test_dump_file_to_stdout_without_file_type():
             {"nested": {"key": "value"}},
             lambda content: ("\n" in content and "    " in content),  # 4-space indent
         ),
+        (
+            ".json",
+            {"unicode": "héllo wörld 世界"},
+            lambda content: "héllo wörld 世界" in content,  # not escaped
+        ),
+        (
+            ".yaml",
+            {"unicode": "héllo wörld 世界"},
+            lambda content: "héllo wörld 世界" in content,  # not escaped
+        ),
         (
             ".env",
             {"KEY1": "value1", "KEY2": "value2"},
@@ -331,7 +339,7 @@ def test_dump_file_format_specific(tmp_path, extension, data, assertions):
     file_path = tmp_path / f"test{extension}"
     dump_file(data, file_path)
 
-    content = file_path.read_text()
+    content = file_path.read_text(encoding="utf-8")
     assert assertions(content)
 
 
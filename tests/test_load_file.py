@@ -1,104 +1,136 @@
 import json
+import re
 from pathlib import Path
 
 import pytest
+import tomli
 import tomli_w
 import yaml
 
 from blendconf import load_file
 
+# Emit the YAML payloads with libyaml when PyYAML was built with it, like
+# blendconf itself does.
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+_UNSUPPORTED_RE = re.compile(r"Unsupported file format")
+
+
+@pytest.fixture(scope="module")
+def scratch(tmp_path_factory):
+    """Directory shared by all tests in this module."""
+    return tmp_path_factory.mktemp("cfg")
+
+
+@pytest.fixture
+def config_path(scratch, request):
+    """Return a function that builds a config file path unique to the test."""
+    stem = re.sub(r"\W", "_", request.node.name)
+
+    def make(extension: str) -> Path:
+        return scratch / f"{stem}{extension}"
+
+    return make
+
 
 @pytest.mark.parametrize(
     "extension,content,expected",
     [
-        # JSON tests
         pytest.param(
             ".json",
-            '{"key": "value", "number": 42}',
+            b'{"key": "value", "number": 42}',
             {"key": "value", "number": 42},
             id="json-dict",
         ),
         pytest.param(
             ".json",
-            '{"nested": {"data": [1, 2, 3]}}',
+            b'{"nested": {"data": [1, 2, 3]}}',
             {"nested": {"data": [1, 2, 3]}},
             id="json-nested",
         ),
-        pytest.param(".json", "[]", [], id="json-empty-list"),
-        pytest.param(".json", "null", None, id="json-null"),
-        pytest.param(".json", "true", True, id="json-bool"),
-        pytest.param(".json", "123", 123, id="json-number"),
-        pytest.param(".json", '"string"', "string", id="json-string"),
-        # YAML tests with .yaml extension
+        pytest.param(".json", b"[]", [], id="json-empty-list"),
+        pytest.param(".json", b"null", None, id="json-null"),
+        pytest.param(".json", b"true", True, id="json-bool"),
+        pytest.param(".json", b"123", 123, id="json-number"),
+        pytest.param(".json", b'"string"', "string", id="json-string"),
+    ],
+)
+def test_load_file_success_json(config_path, extension, content, expected):
+    """Test loading JSON files with various content."""
+    file_path = config_path(extension)
+    file_path.write_bytes(content)
+
+    result = load_file(file_path)
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "content,expected",
+    [
         pytest.param(
-            ".yaml",
-            "key: value\nnumber: 42",
-            {"key": "value", "number": 42},
-            id="yaml-dict",
+            b"key: value\nnumber: 42", {"key": "value", "number": 42}, id="dict"
         ),
         pytest.param(
-            ".yaml",
-            "nested:\n  data:\n    - 1\n    - 2\n    - 3",
+            b"nested:\n  data:\n    - 1\n    - 2\n    - 3",
             {"nested": {"data": [1, 2, 3]}},
-            id="yaml-nested",
-        ),
-        pytest.param(
-            ".yaml",
-            "- item1\n- item2\n- item3",
-            ["item1", "item2", "item3"],
-            id="yaml-list",
-        ),
-        pytest.param(".yaml", "null", None, id="yaml-null"),
-        pytest.param(".yaml", "true", True, id="yaml-bool"),
-        pytest.param(".yaml", "123", 123, id="yaml-number"),
-        pytest.param(".yaml", "string", "string", id="yaml-string"),
-        # YAML tests with .yml extension
-        pytest.param(
-            ".yml",
-            "key: value\nnumber: 42",
-            {"key": "value", "number": 42},
-            id="yml-dict",
+            id="nested",
         ),
         pytest.param(
-            ".yml",
-            "nested:\n  data:\n    - 1\n    - 2\n    - 3",
-            {"nested": {"data": [1, 2, 3]}},
-            id="yml-nested",
+            b"- item1\n- item2\n- item3", ["item1", "item2", "item3"], id="list"
         ),
+        pytest.param(b"null", None, id="null"),
+        pytest.param(b"true", True, id="bool"),
+        pytest.param(b"123", 123, id="number"),
+        pytest.param(b"string", "string", id="string"),
+    ],
+)
+@pytest.mark.parametrize("extension", [".yaml", ".yml"], ids=["yaml", "yml"])
+def test_load_file_success_yaml(config_path, extension, content, expected):
+    """Test loading YAML files with both extensions and various content."""
+    file_path = config_path(extension)
+    file_path.write_bytes(content)
+
+    result = load_file(file_path)
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "extension,content,expected",
+    [
         # TOML tests
         pytest.param(
             ".toml",
-            'key = "value"\nnumber = 42',
+            b'key = "value"\nnumber = 42',
             {"key": "value", "number": 42},
             id="toml-dict",
         ),
         pytest.param(
             ".toml",
-            "[nested]\ndata = [1, 2, 3]",
+            b"[nested]\ndata = [1, 2, 3]",
             {"nested": {"data": [1, 2, 3]}},
             id="toml-nested",
         ),
         # ENV tests
         pytest.param(
             ".env",
-            "KEY=value\nNUMBER=42",
+            b"KEY=value\nNUMBER=42",
             {"KEY": "value", "NUMBER": "42"},
             id="env-basic",
         ),
         pytest.param(
             ".env",
-            "EMPTY=\nSPACES=value with spaces",
+            b"EMPTY=\nSPACES=value with spaces",
             {"EMPTY": "", "SPACES": "value with spaces"},
             id="env-special",
         ),
-        pytest.param(".env", "", {}, id="env-empty"),
-        pytest.param(".env", "INVALID LINE WITHOUT EQUALS", {}, id="env-invalid"),
+        pytest.param(".env", b"", {}, id="env-empty"),
+        pytest.param(".env", b"INVALID LINE WITHOUT EQUALS", {}, id="env-invalid"),
     ],
 )
-def test_load_file_success(tmp_path, extension, content, expected):
-    """Test loading files with various formats and content."""
-    file_path = tmp_path / f"config{extension}"
-    file_path.write_text(content, encoding="utf-8")
+def test_load_file_success_toml_env(config_path, extension, content, expected):
+    """Test loading TOML and ENV files with various content."""
+    file_path = config_path(extension)
+    file_path.write_bytes(content)
 
     result = load_file(file_path)
     assert result == expected
@@ -108,17 +140,17 @@ def test_load_file_success(tmp_path, extension, content, expected):
     "extension,expected",
     [
         # Empty files
-        pytest.param(".json", Exception, id="json-empty"),
+        pytest.param(".json", json.JSONDecodeError, id="json-empty"),
         pytest.param(".yaml", None, id="yaml-empty"),
         pytest.param(".yml", None, id="yml-empty"),
         pytest.param(".toml", {}, id="toml-empty"),
         pytest.param(".env", {}, id="env-empty"),
     ],
 )
-def test_load_file_empty_content(tmp_path, extension, expected):
+def test_load_file_empty_content(config_path, extension, expected):
     """Test loading empty or whitespace-only files."""
-    file_path = tmp_path / f"config{extension}"
-    file_path.write_text("", encoding="utf-8")
+    file_path = config_path(extension)
+    file_path.write_bytes(b"")
 
     if isinstance(expected, type) and issubclass(expected, Exception):
         with pytest.raises(expected):
@@ -130,23 +162,23 @@ def test_load_file_empty_content(tmp_path, extension, expected):
 
 
 @pytest.mark.parametrize(
-    "extension,content",
+    "extension,content,exc_type",
     [
-        (".json", "invalid json {"),
-        (".json", '{"unclosed": '),
-        (".yaml", "invalid: yaml: [unclosed"),
-        (".toml", "invalid toml [unclosed"),
-        (".toml", "= value"),
+        (".json", b"invalid json {", json.JSONDecodeError),
+        (".json", b'{"unclosed": ', json.JSONDecodeError),
+        (".yaml", b"invalid: yaml: [unclosed", yaml.YAMLError),
+        (".toml", b"invalid toml [unclosed", tomli.TOMLDecodeError),
+        (".toml", b"= value", tomli.TOMLDecodeError),
         # .env files will ignore invalid lines, no Excpetion expected
     ],
 )
-def test_load_file_invalid_content(tmp_path, extension, content):
+def test_load_file_invalid_content(config_path, extension, content, exc_type):
     """Test loading files with invalid content."""
-    file_path = tmp_path / f"config{extension}"
-    file_path.write_text(content, encoding="utf-8")
+    file_path = config_path(extension)
+    file_path.write_bytes(content)
 
-    with pytest.raises(Exception):
-        print(load_file(file_path))
+    with pytest.raises(exc_type):
+        load_file(file_path)
 
 
 @pytest.mark.parametrize(
@@ -161,54 +193,54 @@ def test_load_file_invalid_content(tmp_path, extension, content):
         "",
     ],
 )
-def test_load_file_unsupported_format(tmp_path, extension):
+def test_load_file_unsupported_format(config_path, extension):
     """Test loading files with unsupported formats."""
-    file_path = tmp_path / f"config{extension}"
-    file_path.write_text("some content", encoding="utf-8")
+    file_path = config_path(extension)
+    file_path.write_bytes(b"some content")
 
-    with pytest.raises(ValueError, match="Unsupported file format"):
+    with pytest.raises(ValueError, match=_UNSUPPORTED_RE):
         load_file(file_path)
 
 
-def test_load_file_nonexistent(tmp_path):
+def test_load_file_nonexistent(config_path):
     """Test loading a file that doesn't exist."""
-    file_path = tmp_path / "nonexistent.json"
+    file_path = config_path(".json")
 
     with pytest.raises(FileNotFoundError):
         load_file(file_path)
 
 
-@pytest.mark.parametrize(
-    "extension,data",
-    [
+def _serialize(extension, data):
+    """Serialize data into the text format matching the file extension."""
+    match extension:
+        case ".json":
+            return json.dumps(data, ensure_ascii=False)
+        case ".yaml" | ".yml":
+            return yaml.dump(data, allow_unicode=True, Dumper=_YAML_DUMPER)
+        case ".toml":
+            return tomli_w.dumps(data)
+        case ".env":
+            return "\n".join(f"{k}={v}" for k, v in data.items())
+
+
+# Serialized once at import, the tests only write and load the content
+_UNICODE_CASES = [
+    pytest.param(
+        extension, data, _serialize(extension, data).encode("utf-8"), id=extension[1:]
+    )
+    for extension, data in [
         (".json", {"unicode": "Hello 世界 🌍", "special": "Ñoño"}),
         (".yaml", {"unicode": "Hello 世界 🌍", "special": "Ñoño"}),
         (".toml", {"unicode": "Hello 世界 🌍", "special": "Ñoño"}),
         (".env", {"UNICODE": "Hello_世界_🌍", "SPECIAL": "Ñoño"}),
-    ],
-)
-def test_load_file_unicode(tmp_path, extension, data):
-    """Test loading files with unicode content."""
-    file_path = tmp_path / f"config{extension}"
-
-    # Write the file based on format
-    if extension == ".json":
-        file_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
-    elif extension in [".yaml", ".yml"]:
-        file_path.write_text(yaml.dump(data, allow_unicode=True), encoding="utf-8")
-    elif extension == ".toml":
-        file_path.write_bytes(tomli_w.dumps(data).encode("utf-8"))
-    elif extension == ".env":
-        content = "\n".join(f"{k}={v}" for k, v in data.items())
-        file_path.write_text(content, encoding="utf-8")
-
-    result = load_file(file_path)
-    assert result == data
-
+    ]
+]
 
-@pytest.mark.parametrize(
-    "extension,data",
-    [
+_COMPLEX_CASES = [
+    pytest.param(
+        extension, data, _serialize(extension, data).encode("utf-8"), id=extension[1:]
+    )
+    for extension, data in [
         (
             ".json",
             {
@@ -228,39 +260,49 @@ def test_load_file_unicode(tmp_path, extension, data):
             },
         ),
         (".toml", {"list": [1, 2, 3], "dict": {"nested": "value"}, "bool": True}),
-    ],
-)
-def test_load_file_complex_data(tmp_path, extension, data):
-    """Test loading files with complex nested data structures."""
-    file_path = tmp_path / f"config{extension}"
+    ]
+]
+
 
-    if extension == ".json":
-        file_path.write_text(json.dumps(data), encoding="utf-8")
-    elif extension in [".yaml", ".yml"]:
-        file_path.write_text(yaml.dump(data), encoding="utf-8")
-    elif extension == ".toml":
-        file_path.write_bytes(tomli_w.dumps(data).encode("utf-8"))
+@pytest.mark.parametrize("extension,data,serialized", _UNICODE_CASES)
+def test_load_file_unicode(config_path, extension, data, serialized):
+    """Test loading files with unicode content."""
+    file_path = config_path(extension)
+    file_path.write_bytes(serialized)
 
     result = load_file(file_path)
     assert result == data
 
 
-def test_load_file_case_insensitive_extension(tmp_path):
-    """Test that file extensions are case-insensitive."""
-    test_cases = [
-        (".JSON", '{"key": "value"}', {"key": "value"}),
-        (".YAML", "key: value", {"key": "value"}),
-        (".YML", "key: value", {"key": "value"}),
-        (".TOML", 'key = "value"', {"key": "value"}),
-        (".ENV", "KEY=value", {"KEY": "value"}),
-    ]
+@pytest.mark.parametrize("extension,data,serialized", _COMPLEX_CASES)
+def test_load_file_complex_data(config_path, extension, data, serialized):
+    """Test loading files with complex nested data structures."""
+    file_path = config_path(extension)
+    file_path.write_bytes(serialized)
+
+    result = load_file(file_path)
+    assert result == data
 
-    for extension, content, expected in test_cases:
-        file_path = tmp_path / f"config{extension}"
-        file_path.write_text(content, encoding="utf-8")
 
-        result = load_file(file_path)
-        assert result == expected
+@pytest.mark.parametrize(
+    "extension,content,expected",
+    [
+        pytest.param(".JSON", b'{"key": "value"}', {"key": "value"}, id="JSON"),
+        pytest.param(".YAML", b"key: value", {"key": "value"}, id="YAML"),
+        pytest.param(".YML", b"key: value", {"key": "value"}, id="YML"),
+        pytest.param(".TOML", b'key = "value"', {"key": "value"}, id="TOML"),
+        pytest.param(".ENV", b"KEY=value", {"KEY": "value"}, id="ENV"),
+    ],
+)
+def test_load_file_case_insensitive_extension(
+    config_path, extension, content, expected
+):
+    """Test that file extensions are case-insensitive."""
+    file_path = config_path(extension)
+    file_path.write_bytes(content)
+
+    result = load_file(file_path)
+    assert result == expected
 
 
 @pytest.mark.parametrize(
@@ -270,19 +312,21 @@ def test_load_file_case_insensitive_extension(tmp_path):
         (".yaml", {"scientific": 1.23e-4, "negative": -42}),
     ],
 )
-def test_load_file_special_yaml_values(tmp_path, extension, special_values):
+def test_load_file_special_yaml_values(config_path, extension, special_values):
     """Test loading YAML files with special numeric values."""
-    file_path = tmp_path / f"config{extension}"
-    file_path.write_text(yaml.dump(special_values), encoding="utf-8")
+    file_path = config_path(extension)
+    file_path.write_bytes(
+        yaml.dump(special_values, Dumper=_YAML_DUMPER, encoding="utf-8")
+    )
 
     result = load_file(file_path)
     assert result == special_values
 
 
-def test_load_file_env_with_comments_and_quotes(tmp_path):
-    """Test loading .env files with comments, quotes, and special cases."""
-    file_path = tmp_path / "config.env"
-    content = """# Comment
+@pytest.fixture(scope="session")
+def env_comments_bytes():
+    """Content of a .env file with comments, quotes and empty values."""
+    return b"""# Comment
 KEY1=value1
 KEY2="quoted value"
 KEY3='single quoted'
@@ -290,7 +334,12 @@ KEY3='single quoted'
 KEY4=value with spaces
 EMPTY=
 """
-    file_path.write_text(content, encoding="utf-8")
+
+
+def test_load_file_env_with_comments_and_quotes(config_path, env_comments_bytes):
+    """Test loading .env files with comments, quotes, and special cases."""
+    file_path = config_path(".env")
+    file_path.write_bytes(env_comments_bytes)
 
     result = load_file(file_path)
     # dotenv_values handles comments and quotes
@@ -298,11 +347,11 @@ EMPTY=
     assert result["KEY1"] == "value1"
 
 
-def test_load_file_path_object(tmp_path):
+def test_load_file_path_object(config_path):
     """Test that load_file works with Path objects."""
-    file_path = tmp_path / "config.json"
+    file_path = config_path(".json")
     data = {"key": "value"}
-    file_path.write_text(json.dumps(data), encoding="utf-8")
+    file_path.write_bytes(json.dumps(data).encode("utf-8"))
 
     # Ensure file_path is a Path object
     assert isinstance(file_path, Path)